@@ -4,47 +4,79 @@ YouTube Video Downloader with Trimming
 A Python app to download YouTube videos in different resolutions with time-based trimming
 """
 
+import argparse
 import os
 import sys
 import re
+import json
+import shutil
+import threading
+import time
 import yt_dlp
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
+from urllib.parse import urlsplit
+
+# Resolved once at import; a PATH walk is much cheaper than spawning ffmpeg
+FFMPEG_PATH = shutil.which('ffmpeg')
+FFMPEG_AVAILABLE = FFMPEG_PATH is not None
+
+YOUTUBE_HOSTS = frozenset({
+    'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtu.be',
+})
+
+# Signed googlevideo URLs carry their expiry as a unix timestamp
+EXPIRE_RE = re.compile(r'[?&/]expire[=/](\d+)')
+VIDEO_ID_RE = re.compile(r'(?:v=|youtu\.be/|shorts/)([A-Za-z0-9_-]{11})')
+# HH:MM:SS, MM:SS, or SS
+TIME_RE = re.compile(r'^\s*(?:(?:(\d+):)?(\d+):)?(\d+)\s*$')
+
+INFO_CACHE_TTL = 24 * 60 * 60  # Seconds a cached .info.json stays fresh
+# Native audio only converts a non-m4a fallback stream, so the file always matches the m4a label
+NATIVE_AUDIO_CONVERSION = 'webm>m4a/opus>m4a/ogg>m4a/mp3>m4a'
+INFO_MEMORY_CACHE_SIZE = 128  # Video infos kept in memory per downloader
+BATCH_LOOKAHEAD = 3  # Videos whose info is fetched ahead of the current batch download
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+SAFE_TITLE_TABLE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if not (c.isalnum() or c in ' -_')
+))
 
 
 class YouTubeDownloader:
-    def __init__(self):
+    def __init__(self, reencode=False, keep_native_audio=False):
         self.download_path = Path("downloads")
         self.download_path.mkdir(exist_ok=True)
+        self.cache_path = Path.home() / ".cache" / "yt_downloader"
+        self.cache_path.mkdir(parents=True, exist_ok=True)
+        # Trims are stream-copied unless frame-accurate cuts are requested
+        self.reencode = reencode
+        # Audio-only downloads keep YouTube's AAC stream instead of encoding to MP3
+        self.keep_native_audio = keep_native_audio
+        self.audio_ext = 'm4a' if keep_native_audio else 'mp3'
+
+        # Lookups run on one background worker; the lock covers the rare
+        # re-extraction from the main thread while the worker is busy
+        self.info_executor = ThreadPoolExecutor(max_workers=1)
+        self.info_lock = threading.Lock()
+        # Info by video ID, oldest first; refreshed whenever expired info is re-extracted
+        self.info_cache = {}
+
+        # Long-lived instances keep yt-dlp's per-extractor player cache,
+        # so n/sig challenges are solved once per player rather than per lookup.
+        # Mobile clients return plain URLs and usually need no JS at all.
+        self.info_ydl = self.create_info_ydl(['ios', 'android_vr'])
+        self.web_info_ydl = None
 
     def parse_time(self, time_str):
         """Parse time string (HH:MM:SS, MM:SS, or SS) to seconds"""
-        if not time_str.strip():
+        match = TIME_RE.match(time_str)
+        if not match:
             return None
 
-        time_str = time_str.strip()
-
-        # Handle different time formats
-        if ':' in time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:  # MM:SS
-                try:
-                    minutes, seconds = map(int, parts)
-                    return minutes * 60 + seconds
-                except ValueError:
-                    return None
-            elif len(parts) == 3:  # HH:MM:SS
-                try:
-                    hours, minutes, seconds = map(int, parts)
-                    return hours * 3600 + minutes * 60 + seconds
-                except ValueError:
-                    return None
-        else:  # Just seconds
-            try:
-                return int(time_str)
-            except ValueError:
-                return None
-
-        return None
+        hours, minutes, seconds = (int(part) if part else 0 for part in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
 
     def format_duration(self, seconds):
         """Convert seconds to HH:MM:SS format"""
@@ -115,45 +147,129 @@ class YouTubeDownloader:
             else:
                 return None, None
 
-    def get_video_info(self, url):
-        """Get video information and available formats"""
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
+    def create_info_ydl(self, player_client=None):
+        """Create a metadata-only YoutubeDL, optionally pinned to specific player clients"""
+        # Skip the separate DASH/HLS manifest and client-config requests
+        youtube_args = {
+            'skip': ['dash', 'hls'],
+            'player_skip': ['configs'],
         }
+        if player_client:
+            youtube_args['player_client'] = player_client
+            youtube_args['player_skip'] = ['webpage', 'configs']
+            # iOS serves its muxed video+audio formats over HLS
+            youtube_args['skip'] = ['dash']
 
+        return yt_dlp.YoutubeDL({
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+            'noplaylist': True,
+            'getcomments': False,
+            'extractor_args': {'youtube': youtube_args},
+        })
+
+    def extract_info(self, url):
+        """Run yt-dlp metadata extraction for a URL"""
+        with self.info_lock:
+            try:
+                return self.info_ydl.extract_info(url, download=False)
+            except yt_dlp.utils.DownloadError:
+                # Some age-gated videos only play through the default web client
+                if self.web_info_ydl is None:
+                    self.web_info_ydl = self.create_info_ydl()
+                return self.web_info_ydl.extract_info(url, download=False)
+
+    def extract_video_info(self, video_id):
+        """Extract info for a single video, memoized by its 11-char ID"""
+        if video_id in self.info_cache:
+            return self.info_cache[video_id]
+
+        cache_file = self.cache_path / f"{video_id}.info.json"
+
+        # Reuse metadata from a previous run; expired stream URLs are
+        # re-extracted at download time
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            if time.time() - cache_file.stat().st_mtime < INFO_CACHE_TTL:
+                info = json.loads(cache_file.read_text(encoding='utf-8'))
+                self.remember_video_info(video_id, info)
                 return info
+        except (OSError, ValueError):
+            pass
+
+        info = self.extract_info(f"https://www.youtube.com/watch?v={video_id}")
+        self.store_video_info(video_id, info)
+        return info
+
+    def remember_video_info(self, video_id, info):
+        """Keep info in memory, dropping the oldest entry when full"""
+        self.info_cache.pop(video_id, None)
+        if len(self.info_cache) >= INFO_MEMORY_CACHE_SIZE:
+            self.info_cache.pop(next(iter(self.info_cache)), None)
+        self.info_cache[video_id] = info
+
+    def store_video_info(self, video_id, info):
+        """Cache freshly extracted info in memory and on disk"""
+        self.remember_video_info(video_id, info)
+        try:
+            cache_file = self.cache_path / f"{video_id}.info.json"
+            cache_file.write_text(json.dumps(self.info_ydl.sanitize_info(info)), encoding='utf-8')
+        except OSError:
+            pass
+
+    def is_youtube_url(self, url):
+        """Check that a URL's host is a YouTube domain"""
+        if '://' not in url:
+            url = f"https://{url}"
+        return (urlsplit(url).hostname or '') in YOUTUBE_HOSTS
+
+    def get_video_info(self, url):
+        """Get video information and available formats"""
+        match = VIDEO_ID_RE.search(url)
+
+        try:
+            if match:
+                return self.extract_video_info(match.group(1))
+            return self.extract_info(url)
         except Exception as e:
             print(f"Error getting video info: {str(e)}")
             return None
 
+    def is_info_expired(self, info, margin=60):
+        """Check whether the signed format URLs in a video info dict have expired"""
+        for f in info.get('formats') or []:
+            match = EXPIRE_RE.search(f.get('url') or '')
+            if match:
+                return int(match.group(1)) - margin < time.time()
+        return False
+
     def get_available_formats(self, info):
         """Extract available video formats and resolutions"""
         formats = []
         seen_resolutions = set()
 
-        if 'formats' in info:
-            for f in info['formats']:
-                if f.get('vcodec') != 'none' and f.get('acodec') != 'none':  # Has both video and audio
-                    height = f.get('height')
-                    if height and height not in seen_resolutions:
-                        formats.append({
-                            'format_id': f['format_id'],
-                            'resolution': f"{height}p",
-                            'height': height,
-                            'ext': f.get('ext', 'mp4'),
-                            'filesize': f.get('filesize', 'Unknown'),
-                            'fps': f.get('fps', 'Unknown'),
-                            'vcodec': f.get('vcodec', 'Unknown'),
-                            'acodec': f.get('acodec', 'Unknown')
-                        })
-                        seen_resolutions.add(height)
+        for f in info.get('formats') or []:
+            # Only keep formats with both video and audio, one per resolution
+            if f.get('vcodec') == 'none' or f.get('acodec') == 'none':
+                continue
+            height = f.get('height')
+            if not height or height in seen_resolutions:
+                continue
+
+            seen_resolutions.add(height)
+            formats.append({
+                'format_id': f['format_id'],
+                'resolution': f"{height}p",
+                'height': height,
+                'ext': f.get('ext', 'mp4'),
+                'filesize': f.get('filesize', 'Unknown'),
+                'fps': f.get('fps', 'Unknown'),
+                'vcodec': f.get('vcodec', 'Unknown'),
+                'acodec': f.get('acodec', 'Unknown')
+            })
 
         # Sort by resolution (highest first)
-        formats.sort(key=lambda x: x['height'], reverse=True)
+        formats.sort(key=itemgetter('height'), reverse=True)
         return formats
 
     def format_filesize(self, size):
@@ -163,66 +279,97 @@ class YouTubeDownloader:
 
         try:
             size = int(size)
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            return f"{size:.1f} TB"
-        except:
+        except (TypeError, ValueError):
             return "Unknown"
 
+        if size <= 0:
+            return "0.0 B"
+
+        # Each unit step is 10 bits, so the bit length picks the unit directly
+        unit = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size / (1 << (10 * unit)):.1f} {SIZE_UNITS[unit]}"
+
     def display_formats(self, formats, title):
         """Display available formats to user"""
-        print(f"\nVideo: {title}")
-        print("=" * 60)
-        print(f"{'#':<3} {'Resolution':<12} {'Format':<8} {'Size':<12} {'FPS':<6}")
-        print("-" * 60)
+        lines = [
+            f"\nVideo: {title}",
+            "=" * 60,
+            f"{'#':<3} {'Resolution':<12} {'Format':<8} {'Size':<12} {'FPS':<6}",
+            "-" * 60,
+        ]
 
         for i, fmt in enumerate(formats, 1):
             size_str = self.format_filesize(fmt['filesize'])
             fps_str = str(fmt['fps']) if fmt['fps'] != 'Unknown' else 'N/A'
-            print(f"{i:<3} {fmt['resolution']:<12} {fmt['ext']:<8} {size_str:<12} {fps_str:<6}")
+            lines.append(f"{i:<3} {fmt['resolution']:<12} {fmt['ext']:<8} {size_str:<12} {fps_str:<6}")
+
+        lines.append(f"{len(formats) + 1:<3} {'Audio Only':<12} {self.audio_ext:<8} {'N/A':<12} {'N/A':<6}")
+        lines.append("-" * 60)
+
+        # Emit the whole table in one write
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    def get_trim_args(self, start_time, end_time, accurate=False):
+        """Build FFmpeg input-side and output-side args for trimming"""
+        input_args = []
+        output_args = []
+
+        # Seeking before the input jumps straight to the nearest keyframe
+        if start_time is not None:
+            if accurate:
+                # Coarse seek a little early, then decode only the remainder
+                coarse_start = max(0, start_time - 2)
+                input_args.extend(['-ss', str(coarse_start)])
+                output_args.extend(['-ss', str(start_time - coarse_start)])
+            else:
+                input_args.extend(['-ss', str(start_time)])
+
+        # Timestamps restart at zero after an input seek, so cut by duration
+        if end_time is not None:
+            output_args.extend(['-t', str(end_time - (start_time or 0))])
 
-        print(f"{len(formats) + 1:<3} {'Audio Only':<12} {'mp3':<8} {'N/A':<12} {'N/A':<6}")
-        print("-" * 60)
+        return input_args, output_args
 
     def create_postprocessors(self, start_time, end_time):
         """Create FFmpeg postprocessors for trimming"""
-        postprocessors = []
+        if start_time is None and end_time is None:
+            return [], {}
 
-        if start_time is not None or end_time is not None:
-            # FFmpeg options for trimming
-            ffmpeg_args = []
+        input_args, output_args = self.get_trim_args(start_time, end_time, accurate=self.reencode)
 
-            if start_time is not None:
-                ffmpeg_args.extend(['-ss', str(start_time)])
+        if self.reencode:
+            output_args.extend(['-c:v', 'libx264', '-c:a', 'aac'])
+        else:
+            # Remux the already-encoded streams instead of re-encoding them
+            output_args.extend(['-c', 'copy', '-avoid_negative_ts', 'make_zero'])
 
-            if end_time is not None:
-                if start_time is not None:
-                    duration = end_time - start_time
-                    ffmpeg_args.extend(['-t', str(duration)])
-                else:
-                    ffmpeg_args.extend(['-to', str(end_time)])
+        # Drop chapters in the same pass rather than running FFmpegMetadata afterwards
+        output_args.extend(['-map_chapters', '-1'])
 
-            postprocessors.append({
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-                'when': 'after_video',
-            })
+        postprocessors = [{
+            'key': 'FFmpegCopyStream',
+        }]
 
-            # Add custom FFmpeg args
-            postprocessors.append({
-                'key': 'FFmpegMetadata',
-                'add_chapters': False,
-            })
+        postprocessor_args = {
+            'copystream+ffmpeg_i1': input_args,
+            'copystream+ffmpeg_o1': output_args,
+        }
+
+        return postprocessors, postprocessor_args
 
-        return postprocessors, ffmpeg_args if start_time is not None or end_time is not None else []
+    def get_safe_title(self, title):
+        """Strip a title down to filename-safe characters"""
+        if title.isascii():
+            # Delete disallowed characters in a single C-level pass
+            safe_title = title.translate(SAFE_TITLE_TABLE)
+        else:
+            safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_'))
+        return safe_title.rstrip()[:50]  # Limit filename length
 
-    def download_video(self, url, format_choice, title, start_time=None, end_time=None):
+    def download_video(self, url, format_choice, title, start_time=None, end_time=None, info=None):
         """Download video with selected format and optional trimming"""
         # Clean title for filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:50]  # Limit filename length
+        safe_title = self.get_safe_title(title)
 
         # Add trim info to filename if trimming
         if start_time is not None or end_time is not None:
@@ -231,9 +378,24 @@ class YouTubeDownloader:
             safe_title += f"_trim_{start_str}-{end_str}"
 
         # Create postprocessors and FFmpeg args
-        postprocessors, ffmpeg_args = self.create_postprocessors(start_time, end_time)
+        postprocessors, postprocessor_args = self.create_postprocessors(start_time, end_time)
+
+        if format_choice == 'audio' and self.keep_native_audio:
+            ydl_opts = {
+                'format': 'bestaudio[ext=m4a]/bestaudio',
+                'outtmpl': str(self.download_path / f'{safe_title}.%(ext)s'),
+                'postprocessors': [{
+                    'key': 'FFmpegExtractAudio',
+                    'preferredcodec': NATIVE_AUDIO_CONVERSION,
+                }],
+            }
 
-        if format_choice == 'audio':
+            # The stream is already audio-only, so a trim is a plain -c copy remux
+            if postprocessors:
+                ydl_opts['postprocessors'] += postprocessors
+                ydl_opts['postprocessor_args'] = postprocessor_args
+        elif format_choice == 'audio':
+            # Trimming rides along in the same ffmpeg pass that encodes the MP3
             ydl_opts = {
                 'format': 'bestaudio/best',
                 'outtmpl': str(self.download_path / f'{safe_title}.%(ext)s'),
@@ -245,9 +407,11 @@ class YouTubeDownloader:
             }
 
             # Add trimming for audio
-            if ffmpeg_args:
+            if start_time is not None or end_time is not None:
+                input_args, output_args = self.get_trim_args(start_time, end_time)
                 ydl_opts['postprocessor_args'] = {
-                    'ffmpeg': ffmpeg_args
+                    'extractaudio+ffmpeg_i1': input_args,
+                    'extractaudio+ffmpeg_o1': output_args,
                 }
         else:
             ydl_opts = {
@@ -260,10 +424,12 @@ class YouTubeDownloader:
                 ydl_opts['postprocessors'] = postprocessors
 
             # Add FFmpeg arguments for trimming
-            if ffmpeg_args:
-                ydl_opts['postprocessor_args'] = {
-                    'ffmpeg': ffmpeg_args
-                }
+            if postprocessor_args:
+                ydl_opts['postprocessor_args'] = postprocessor_args
+
+        # Point yt-dlp at the binary we already located
+        if FFMPEG_PATH:
+            ydl_opts['ffmpeg_location'] = FFMPEG_PATH
 
         try:
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
@@ -271,7 +437,22 @@ class YouTubeDownloader:
                 if start_time is not None or end_time is not None:
                     print("✂️  Trimming enabled - this may take longer...")
                 print("Please wait...")
-                ydl.download([url])
+                if not info or self.is_info_expired(info):
+                    # Re-extract on the long-lived instance, whose player cache is already warm
+                    info = self.extract_info(url)
+                    # Later lookups get the fresh info instead of extracting again
+                    match = VIDEO_ID_RE.search(url)
+                    if match:
+                        self.store_video_info(match.group(1), info)
+                # Reuse the extracted metadata so the download never re-runs the extractor
+                info = ydl.sanitize_info(info, remove_private_keys=True)
+                if format_choice != 'audio':
+                    # The menu already validated this format id, so hand yt-dlp only
+                    # that format instead of letting it sort and select from all of them
+                    chosen = [f for f in info.get('formats') or [] if f.get('format_id') == format_choice]
+                    if chosen:
+                        info['formats'] = chosen
+                ydl.process_ie_result(info, download=True)
                 print("✅ Download completed successfully!")
                 return True
         except Exception as e:
@@ -279,6 +460,49 @@ class YouTubeDownloader:
             print("💡 Note: Trimming requires FFmpeg to be installed")
             return False
 
+    def batch_run(self, urls):
+        """Download several videos at their best quality, fetching info ahead of each download"""
+        valid_urls = [url for url in urls if self.is_youtube_url(url)]
+        for url in urls:
+            if url not in valid_urls:
+                print(f"⚠️  Skipping invalid YouTube URL: {url}")
+
+        print(f"📦 Batch mode: {len(valid_urls)} videos")
+
+        # The info worker stays a few URLs ahead of the downloads below, so the
+        # next lookup overlaps the current download without holding every info dict
+        upcoming = iter(valid_urls)
+        lookahead = deque()
+
+        def top_up():
+            for url in upcoming:
+                lookahead.append((url, self.info_executor.submit(self.get_video_info, url)))
+                if len(lookahead) >= BATCH_LOOKAHEAD:
+                    break
+
+        try:
+            top_up()
+            for i in range(1, len(valid_urls) + 1):
+                url, info_future = lookahead.popleft()
+                info = info_future.result()
+                top_up()
+                if not info:
+                    print(f"❌ [{i}/{len(valid_urls)}] Could not retrieve video information for {url}")
+                    continue
+
+                formats = self.get_available_formats(info)
+                if not formats:
+                    print(f"❌ [{i}/{len(valid_urls)}] No suitable video formats found for {url}")
+                    continue
+
+                title = info.get('title', 'Unknown Title')
+                print(f"\n📹 [{i}/{len(valid_urls)}] {title} ({formats[0]['resolution']})")
+                self.download_video(url, formats[0]['format_id'], title, info=info)
+        finally:
+            # On Ctrl-C, don't make interpreter exit wait for lookups nobody will use
+            for url, info_future in lookahead:
+                info_future.cancel()
+
     def run(self):
         """Main application loop"""
         print("🎥 YouTube Video Downloader with Trimming")
@@ -298,14 +522,26 @@ class YouTubeDownloader:
                     print("Please enter a valid URL.")
                     continue
 
-                if 'youtube.com' not in url and 'youtu.be' not in url:
+                # Several URLs separated by spaces or commas run as a batch
+                urls = url.replace(',', ' ').split()
+                if len(urls) > 1:
+                    self.batch_run(urls)
+                    continue
+
+                if not self.is_youtube_url(url):
                     print("Please enter a valid YouTube URL.")
                     continue
 
+                # Fetch video info in the background while the user answers the trim prompt
+                info_future = self.info_executor.submit(self.get_video_info, url)
+
+                # Ask about trimming
+                trim_choice = input("\nDo you want to trim the video? (y/n): ").strip().lower()
+
                 print("🔍 Getting video information...")
 
                 # Get video info
-                info = self.get_video_info(url)
+                info = info_future.result()
                 if not info:
                     print("❌ Could not retrieve video information. Please check the URL.")
                     continue
@@ -331,27 +567,24 @@ class YouTubeDownloader:
 
                 # Get user choice for format
                 while True:
-                    try:
-                        choice = input(f"\nSelect format (1-{len(formats) + 1}): ").strip()
-                        choice_num = int(choice)
-
-                        if choice_num == len(formats) + 1:
-                            # Audio only
-                            selected_format = 'audio'
-                            print("Selected: Audio Only (MP3)")
-                            break
-                        elif 1 <= choice_num <= len(formats):
-                            selected_format = formats[choice_num - 1]['format_id']
-                            selected_res = formats[choice_num - 1]['resolution']
-                            print(f"Selected: {selected_res}")
-                            break
-                        else:
-                            print(f"Please enter a number between 1 and {len(formats) + 1}")
-                    except ValueError:
+                    choice = input(f"\nSelect format (1-{len(formats) + 1}): ").strip()
+                    if not choice.isdecimal():
                         print("Please enter a valid number.")
+                        continue
+                    choice_num = int(choice)
 
-                # Ask about trimming
-                trim_choice = input("\nDo you want to trim the video? (y/n): ").strip().lower()
+                    if choice_num == len(formats) + 1:
+                        # Audio only
+                        selected_format = 'audio'
+                        print(f"Selected: Audio Only ({self.audio_ext.upper()})")
+                        break
+                    elif 1 <= choice_num <= len(formats):
+                        selected_format = formats[choice_num - 1]['format_id']
+                        selected_res = formats[choice_num - 1]['resolution']
+                        print(f"Selected: {selected_res}")
+                        break
+                    else:
+                        print(f"Please enter a number between 1 and {len(formats) + 1}")
 
                 start_time, end_time = None, None
                 if trim_choice in ['y', 'yes']:
@@ -361,7 +594,7 @@ class YouTubeDownloader:
                         print("⚠️  Cannot trim - video duration unknown")
 
                 # Download
-                success = self.download_video(url, selected_format, title, start_time, end_time)
+                success = self.download_video(url, selected_format, title, start_time, end_time, info)
 
                 if success:
                     continue_choice = input("\nDownload another video? (y/n): ").strip().lower()
@@ -379,19 +612,24 @@ class YouTubeDownloader:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Download YouTube videos with optional trimming")
+    parser.add_argument('--reencode', action='store_true',
+                        help="re-encode trims for frame-accurate cuts instead of stream-copying (slower)")
+    parser.add_argument('--native-audio', action='store_true',
+                        help="save audio-only downloads as m4a without re-encoding to MP3")
+    args = parser.parse_args()
+
     try:
         print("🔧 Checking dependencies...")
 
         # Check if FFmpeg is available for trimming
-        import subprocess
-        try:
-            subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+        if FFMPEG_AVAILABLE:
             print("✅ FFmpeg found - trimming enabled")
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        else:
             print("⚠️  FFmpeg not found - trimming will not work")
             print("   Install FFmpeg for trimming functionality")
 
-        downloader = YouTubeDownloader()
+        downloader = YouTubeDownloader(reencode=args.reencode, keep_native_audio=args.native_audio)
         downloader.run()
 
     except ImportError:
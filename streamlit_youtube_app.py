@@ -8,13 +8,81 @@ import streamlit as st
 import os
 import sys
 import re
+import json
+import hashlib
+import mimetypes
 import yt_dlp
-import subprocess
+from yt_dlp.postprocessor import PostProcessor
+import shutil
 import tempfile
 import zipfile
+import urllib.parse
+import queue
+import threading
+import types
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
 import time
-from datetime import datetime
+
+# Seconds that cached video metadata is considered fresh
+META_TTL = 3600
+# Watch, Shorts, embed, live and youtu.be links to a single video id
+YOUTUBE_URL_RE = re.compile(
+    r'^(?:https?://)?(?:www\.|m\.|music\.)?'
+    r'(?:youtube\.com/(?:watch\?(?:[^#]*&)?v=|shorts/|embed/|live/)|youtu\.be/)'
+    r'[\w-]{11}(?![\w-])'
+)
+# Query parameters that only pick a start time, playlist position or share source
+IGNORED_URL_PARAMS = frozenset({'t', 'list', 'index', 'pp', 'si', 'feature', 'start_radio'})
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+# Anything other than letters, digits, spaces, '-' and '_' is dropped from filenames
+UNSAFE_TITLE_RE = re.compile(r'[^\w \-]+')
+TIMESTAMP_FMT = "%Y%m%d_%H%M%S"
+# HH:MM:SS, MM:SS, or SS
+TIME_RE = re.compile(r'^(?:(?:(\d+):)?(\d+):)?(\d+)$')
+# Seconds between reruns while a background job is running
+POLL_INTERVAL = 0.1
+
+# yt-dlp's player/signature cache; mount this directory persistently in containers
+# so YouTube's player JS isn't downloaded and deciphered again after every restart
+YTDLP_CACHE_DIR = (Path(__file__).parent / ".ytdlp-cache").resolve()
+# Video metadata holds signed stream URLs, so it lives outside the publicly served static folder
+META_CACHE_DIR = (Path(__file__).parent / ".meta-cache").resolve()
+
+# Add headers to bypass 403 errors
+DEFAULT_HEADERS = types.MappingProxyType({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-us,en;q=0.5',
+    'Accept-Encoding': 'gzip,deflate',
+    'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
+    'Connection': 'keep-alive',
+})
+
+# Options shared by metadata fetches and downloads; read-only so no caller can change them for the others
+BASE_OPTS = types.MappingProxyType({
+    'http_headers': DEFAULT_HEADERS,
+    # Use cookies if available
+    'cookiefile': None,
+    # Bypass age verification
+    'age_limit': 99,
+    'cachedir': str(YTDLP_CACHE_DIR),
+})
+
+# Best video up to 1080p merged with the best audio, falling back to a single combined stream
+BEST_FORMAT = "bestvideo[height<=?1080]+bestaudio/best[height<=?1080]/best"
+# Parallel fragment downloads per file; the work is network-bound, so this doesn't follow the CPU count
+FRAGMENT_WORKERS = 8
+
+# Largest file Streamlit's static file serving will hand out
+STATIC_MAX_SIZE = 200 << 20
+# Minimum seconds and fraction complete between progress updates
+PROGRESS_INTERVAL = 0.1
+PROGRESS_STEP = 0.005
 
 # Configure Streamlit page
 st.set_page_config(
@@ -25,56 +93,154 @@ st.set_page_config(
 )
 
 
+@st.cache_data(ttl=5, show_spinner=False)
+def count_downloads(path):
+    """Count downloaded files, skipping hidden cache directories and in-progress downloads"""
+    # Safe titles never contain '.', so '.part' can only come from yt-dlp's temporary files
+    with os.scandir(path) as entries:
+        return sum(1 for entry in entries
+                   if not entry.name.startswith('.') and '.part' not in entry.name
+                   and not entry.name.endswith('.ytdl'))
+
+
+@st.cache_resource(show_spinner=False)
+def check_ffmpeg():
+    """Check once per process whether FFmpeg is installed"""
+    # A PATH lookup is enough; no need to spawn ffmpeg just to see if it exists
+    return shutil.which('ffmpeg') is not None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_info_ydl(cookiefile=None):
+    """Long-lived YoutubeDL for metadata, so its extractors and player cache are reused across reruns"""
+    ydl_opts = {
+        **BASE_OPTS,
+        'cookiefile': cookiefile,
+        'quiet': True,
+        'no_warnings': True,
+        # Use oauth2 if needed
+        'username': None,
+        'password': None,
+    }
+    return yt_dlp.YoutubeDL(ydl_opts), threading.Lock()
+
+
+@st.cache_resource
+def get_executor():
+    """Shared worker pool for metadata fetches and downloads, kept across reruns"""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def normalize_url(url):
+    """Drop query parameters that don't change which video a URL points at"""
+    parts = urllib.parse.urlsplit(url.strip())
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query) if k not in IGNORED_URL_PARAMS]
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query), fragment=''))
+
+
+def is_meta_fresh(meta_file):
+    """Check whether a metadata cache file exists and is within the TTL"""
+    if meta_file is None:
+        return False
+    try:
+        return time.time() - meta_file.stat().st_mtime < META_TTL
+    except OSError:
+        return False
+
+
+@st.cache_data(ttl=META_TTL, show_spinner=False)
+def fetch_video_info(url, meta_file, cookiefile=None):
+    """Get video information, memoized across reruns and sessions"""
+    # Check the on-disk cache before hitting YouTube
+    if is_meta_fresh(meta_file):
+        try:
+            return json.loads(meta_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            pass
+
+    ydl, lock = get_info_ydl(cookiefile)
+    # One YoutubeDL is shared across threads, so extractions take turns
+    with lock:
+        info = ydl.sanitize_info(ydl.extract_info(url, download=False))
+
+    if meta_file is not None:
+        try:
+            meta_file.write_text(json.dumps(info), encoding='utf-8')
+        except OSError:
+            pass
+
+    return info
+
+
+class CookieFile:
+    """Private temp copy of an uploaded cookies.txt, deleted when replaced or when its session is dropped"""
+
+    def __init__(self, data):
+        fd, self.path = tempfile.mkstemp(prefix='yt_cookies_', suffix='.txt')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.remove = weakref.finalize(self, Path(self.path).unlink, missing_ok=True)
+
+
+class FinalPathRecorder(PostProcessor):
+    """Remembers where yt-dlp left the finished file"""
+
+    def __init__(self):
+        super().__init__()
+        self.filepath = None
+
+    def run(self, info):
+        self.filepath = Path(info['filepath'])
+        return [], info
+
+
 class StreamlitYouTubeDownloader:
     def __init__(self):
-        self.download_path = Path("downloads")
+        # Streamlit serves the static folder next to the script at /app/static/
+        self.download_path = Path(__file__).parent / "static"
         self.download_path.mkdir(exist_ok=True)
+        self.meta_path = META_CACHE_DIR
+        self.meta_path.mkdir(exist_ok=True)
+        # Older versions kept metadata under static/, where anyone could fetch it
+        shutil.rmtree(self.download_path / ".meta", ignore_errors=True)
+        YTDLP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
         # Initialize session state
         if 'video_info' not in st.session_state:
             st.session_state.video_info = None
         if 'formats' not in st.session_state:
             st.session_state.formats = []
+            st.session_state.formats_by_res = {}
+            st.session_state.format_options = []
+            st.session_state.formats_video_id = None
         if 'download_status' not in st.session_state:
             st.session_state.download_status = None
+        if 'downloaded' not in st.session_state:
+            st.session_state.downloaded = {}
+        if 'download_result' not in st.session_state:
+            st.session_state.download_result = None
+        if 'cookiefile' not in st.session_state:
+            st.session_state.cookiefile = None
+            st.session_state.cookie_copy = None
+            st.session_state.cookie_upload_id = None
 
     def parse_time(self, time_str):
         """Parse time string (HH:MM:SS, MM:SS, or SS) to seconds"""
-        if not time_str.strip():
+        match = TIME_RE.match(time_str.strip())
+        if not match:
             return None
 
-        time_str = time_str.strip()
-
-        if ':' in time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:  # MM:SS
-                try:
-                    minutes, seconds = map(int, parts)
-                    return minutes * 60 + seconds
-                except ValueError:
-                    return None
-            elif len(parts) == 3:  # HH:MM:SS
-                try:
-                    hours, minutes, seconds = map(int, parts)
-                    return hours * 3600 + minutes * 60 + seconds
-                except ValueError:
-                    return None
-        else:  # Just seconds
-            try:
-                return int(time_str)
-            except ValueError:
-                return None
-
-        return None
+        hours, minutes, seconds = (int(part) if part else 0 for part in match.groups())
+        return hours * 3600 + minutes * 60 + seconds
 
     def format_duration(self, seconds):
         """Convert seconds to HH:MM:SS format"""
         if not seconds:
             return "Unknown"
 
-        hours = seconds // 3600
-        minutes = (seconds % 3600) // 60
-        secs = seconds % 60
+        # yt-dlp may report a float duration, which the :02d format would reject
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
 
         if hours > 0:
             return f"{hours:02d}:{minutes:02d}:{secs:02d}"
@@ -88,116 +254,121 @@ class StreamlitYouTubeDownloader:
 
         try:
             size = int(size)
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            return f"{size:.1f} TB"
-        except:
+        except (TypeError, ValueError):
             return "Unknown"
 
-    def get_video_info(self, url):
-        """Get video information and available formats"""
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            # Add headers to bypass 403 errors
-            'http_headers': {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-us,en;q=0.5',
-                'Accept-Encoding': 'gzip,deflate',
-                'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
-                'Connection': 'keep-alive',
-            },
-            # Use cookies if available
-            'cookiefile': None,
-            # Bypass age verification
-            'age_limit': 99,
-            # Use oauth2 if needed
-            'username': None,
-            'password': None,
-        }
+        if size <= 0:
+            return "0.0 B"
 
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info
-        except Exception as e:
-            st.error(f"Error getting video info: {str(e)}")
+        # Each unit step is 10 bits, so the bit length picks the unit directly
+        unit = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size / (1 << (10 * unit)):.1f} {SIZE_UNITS[unit]}"
+
+    def get_meta_file(self, url, cookiefile=None):
+        """Get the on-disk metadata cache file for a URL, or None for signed-in lookups"""
+        # Info fetched with a user's cookies must not be served to other sessions, so it isn't stored
+        if cookiefile:
             return None
+        return self.meta_path / f"{hashlib.blake2b(url.encode(), digest_size=16).hexdigest()}.info.json"
+
+    def get_video_info(self, url, cookiefile=None):
+        """Get video information and available formats (runs on a worker thread)"""
+        return fetch_video_info(url, self.get_meta_file(url, cookiefile), cookiefile)
+
+    def save_cookies(self, upload):
+        """Copy an uploaded cookies.txt to a private temp file for yt-dlp, which also writes to it"""
+        upload_id = upload.file_id if upload is not None else None
+        if upload_id == st.session_state.cookie_upload_id:
+            return
+
+        # The old copy holds the user's YouTube session, so don't leave it behind
+        if st.session_state.cookie_copy is not None:
+            st.session_state.cookie_copy.remove()
+
+        st.session_state.cookie_copy = None
+        st.session_state.cookiefile = None
+        if upload is not None:
+            st.session_state.cookie_copy = CookieFile(upload.getvalue())
+            st.session_state.cookiefile = st.session_state.cookie_copy.path
+        st.session_state.cookie_upload_id = upload_id
 
     def get_available_formats(self, info):
         """Extract available video formats and resolutions - IMPROVED VERSION"""
+        # Keep the highest-bitrate stream for each height in a single pass
+        best_by_height = {}
+        for f in info.get('formats', ()):
+            # Get video formats (including video-only streams)
+            height = f.get('height')
+            if not height or not f.get('vcodec') or f.get('vcodec') == 'none':
+                continue
+
+            prev = best_by_height.get(height)
+            if prev is None or (f.get('tbr') or 0) > (prev.get('tbr') or 0):
+                best_by_height[height] = f
+
         formats = []
-        seen_resolutions = set()
-
-        if 'formats' in info:
-            for f in info['formats']:
-                # Get video formats (including video-only streams)
-                if f.get('vcodec') and f.get('vcodec') != 'none':
-                    height = f.get('height')
-                    width = f.get('width')
-
-                    if height and height not in seen_resolutions:
-                        # Determine if it's a combined format or video-only
-                        has_audio = f.get('acodec') and f.get('acodec') != 'none'
-                        format_type = "Combined" if has_audio else "Video-only"
-
-                        formats.append({
-                            'format_id': f['format_id'],
-                            'resolution': f"{height}p",
-                            'height': height,
-                            'width': width,
-                            'ext': f.get('ext', 'mp4'),
-                            'filesize': f.get('filesize', 'Unknown'),
-                            'fps': f.get('fps', 'Unknown'),
-                            'vcodec': f.get('vcodec', 'Unknown'),
-                            'acodec': f.get('acodec', 'Unknown'),
-                            'tbr': f.get('tbr', 0),  # Total bitrate
-                            'vbr': f.get('vbr', 0),  # Video bitrate
-                            'abr': f.get('abr', 0),  # Audio bitrate
-                            'has_audio': has_audio,
-                            'format_type': format_type,
-                            'format_note': f.get('format_note', ''),
-                            'quality': f.get('quality', 0)
-                        })
-                        seen_resolutions.add(height)
-
-        # Sort by resolution (highest first), then by quality/bitrate
-        formats.sort(key=lambda x: (x['height'], x['tbr'] or 0, x['vbr'] or 0), reverse=True)
-
-        # Debug: Print available formats to console
-        st.write("**Available formats found:**")
-        for fmt in formats:
-            st.write(f"- {fmt['resolution']} ({fmt['format_type']}) - {fmt['vcodec']} - {fmt['format_note']}")
+        for f in best_by_height.values():
+            # Determine if it's a combined format or video-only
+            has_audio = f.get('acodec') and f.get('acodec') != 'none'
+            format_type = "Combined" if has_audio else "Video-only"
+
+            formats.append({
+                'format_id': f['format_id'],
+                'resolution': f"{f['height']}p",
+                'height': f['height'],
+                'width': f.get('width'),
+                'ext': f.get('ext', 'mp4'),
+                'filesize': f.get('filesize', 'Unknown'),
+                'fps': f.get('fps', 'Unknown'),
+                'vcodec': f.get('vcodec', 'Unknown'),
+                'acodec': f.get('acodec', 'Unknown'),
+                'tbr': f.get('tbr', 0),  # Total bitrate
+                'vbr': f.get('vbr', 0),  # Video bitrate
+                'abr': f.get('abr', 0),  # Audio bitrate
+                'has_audio': has_audio,
+                'format_type': format_type,
+                'format_note': f.get('format_note', ''),
+                'quality': f.get('quality', 0)
+            })
+
+        # Sort by resolution (highest first); there is one entry per height
+        formats.sort(key=itemgetter('height'), reverse=True)
 
         return formats
 
+    def set_formats(self, info):
+        """Store the formats for a video, indexed by resolution, along with the selectbox options"""
+        # Fetching the same video again yields the same format table, so keep the one we have
+        video_id = info.get('id') if info else None
+        if not video_id or video_id != st.session_state.formats_video_id:
+            st.session_state.formats_video_id = video_id
+            formats = self.get_available_formats(info) if info else []
+            st.session_state.formats = formats
+            st.session_state.formats_by_res = {fmt['resolution']: fmt for fmt in formats}
+            st.session_state.format_options = self.create_download_options(formats)
+
+        if info:
+            self.show_available_formats(st.session_state.formats)
+
+    def show_available_formats(self, formats):
+        """Debug: Print available formats in a single markdown block"""
+        lines = ["**Available formats found:**"]
+        lines.extend(f"- {fmt['resolution']} ({fmt['format_type']}) - {fmt['vcodec']} - {fmt['format_note']}"
+                     for fmt in formats)
+        st.markdown("\n".join(lines))
+
     def create_download_options(self, formats):
         """Create download options for selectbox - IMPROVED"""
         options = []
 
-        # Group formats by resolution
-        resolution_groups = {}
-        for fmt in formats:
-            res = fmt['resolution']
-            if res not in resolution_groups:
-                resolution_groups[res] = []
-            resolution_groups[res].append(fmt)
-
         # Add best overall quality option
         if formats:
             best_format = formats[0]
             options.append(f"🎯 Best Quality ({best_format['resolution']}) - Auto Select")
 
-        # Add resolution options with format details
-        for resolution in sorted(resolution_groups.keys(), key=lambda x: int(x[:-1]), reverse=True):
-            res_formats = resolution_groups[resolution]
-
-            # Find best format for this resolution
-            best_for_res = max(res_formats, key=lambda x: (x['has_audio'], x['tbr'] or 0, x['vbr'] or 0))
-
+        # Add resolution options with format details; formats are already one per height, highest first
+        for best_for_res in formats:
+            resolution = best_for_res['resolution']
             size_str = self.format_filesize(best_for_res['filesize'])
             fps_str = f"{best_for_res['fps']}fps" if best_for_res['fps'] != 'Unknown' else ''
             type_str = "📹+🔊" if best_for_res['has_audio'] else "📹"
@@ -213,50 +384,42 @@ class StreamlitYouTubeDownloader:
 
         return options
 
-    def get_format_from_selection(self, selection, formats):
+    def get_format_from_selection(self, selection, formats_by_res):
         """Get format_id from user selection - IMPROVED"""
         if selection.startswith("🎯 Best Quality"):
             # Return format that will give best quality (yt-dlp will merge if needed)
-            return "best[height<=?1080]/best"  # Prefer up to 1080p, fallback to best available
+            return BEST_FORMAT  # Prefer up to 1080p, fallback to best available
         elif selection.startswith("🎵 Audio Only"):
             return "bestaudio/best"
         else:
             # Extract resolution from selection
-            try:
-                # Parse resolution (e.g., "1080p" from "📹+🔊 1080p (mp4) - 125.5 MB")
-                parts = selection.split(' ')
-                for part in parts:
-                    if part.endswith('p'):
-                        target_resolution = part
-                        target_height = int(target_resolution[:-1])
-
-                        # Find best format for this resolution
-                        matching_formats = [f for f in formats if f['height'] == target_height]
-                        if matching_formats:
-                            # Prefer combined formats, then highest bitrate
-                            best_match = max(matching_formats,
-                                             key=lambda x: (x['has_audio'], x['tbr'] or 0, x['vbr'] or 0))
-
-                            # If it's video-only, use yt-dlp format selector to merge with audio
-                            if not best_match['has_audio']:
-                                return f"best[height<={target_height}]/best"
-                            else:
-                                return best_match['format_id']
-                        break
-            except (ValueError, IndexError):
-                pass
+            # Parse resolution (e.g., "1080p" from "📹+🔊 1080p (mp4) - 125.5 MB")
+            parts = selection.split(' ')
+            for part in parts:
+                if part.endswith('p'):
+                    # Look up the format kept for this resolution
+                    best_match = formats_by_res.get(part)
+                    if best_match:
+                        # If it's video-only, fetch the best audio alongside it and merge,
+                        # preferring m4a so it can be stream-copied into the mp4
+                        if not best_match['has_audio']:
+                            format_id = best_match['format_id']
+                            return f"{format_id}+bestaudio[ext=m4a]/{format_id}+bestaudio"
+                        else:
+                            return best_match['format_id']
+                    break
 
         # Fallback to best quality
-        return "best[height<=?1080]/best"
+        return BEST_FORMAT
 
-    def download_video(self, url, format_choice, title, start_time=None, end_time=None, progress_callback=None):
-        """Download video with selected format and optional trimming"""
+    def download_video(self, url, format_choice, title, start_time=None, end_time=None, progress_callback=None,
+                       accurate_trim=False, cookiefile=None):
+        """Download video with selected format and optional trimming (runs on a worker thread)"""
         # Clean title for filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:50]
+        safe_title = UNSAFE_TITLE_RE.sub('', title)[:50].rstrip()
 
         # Add timestamp to filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = time.strftime(TIMESTAMP_FMT)
         safe_title = f"{safe_title}_{timestamp}"
 
         # Add trim info to filename if trimming
@@ -265,42 +428,50 @@ class StreamlitYouTubeDownloader:
             end_str = f"{end_time}s" if end_time else "end"
             safe_title += f"_trim_{start_str}-{end_str}"
 
-        # Progress hook for Streamlit
+        # Progress hook for Streamlit, throttled so fast downloads don't flood the page with updates
+        last_time = [0.0]
+        last_progress = [-1.0]
+
         def progress_hook(d):
             if progress_callback and d['status'] == 'downloading':
-                if 'total_bytes' in d:
-                    progress = d['downloaded_bytes'] / d['total_bytes']
-                    progress_callback(progress)
-                elif 'total_bytes_estimate' in d:
-                    progress = d['downloaded_bytes'] / d['total_bytes_estimate']
-                    progress_callback(progress)
+                total = d.get('total_bytes') or d.get('total_bytes_estimate')
+                if not total:
+                    return
+
+                now = time.monotonic()
+                progress = d['downloaded_bytes'] / total
+                if now - last_time[0] > PROGRESS_INTERVAL and abs(progress - last_progress[0]) > PROGRESS_STEP:
+                    last_time[0] = now
+                    last_progress[0] = progress
+                    progress_callback(d['downloaded_bytes'], total)
 
         # Base options with 403 bypass measures
         base_opts = {
             'outtmpl': str(self.download_path / f'{safe_title}.%(ext)s'),
             'progress_hooks': [progress_hook],
-            # Anti-403 measures
-            'http_headers': {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-us,en;q=0.5',
-                'Accept-Encoding': 'gzip,deflate',
-                'Accept-Charset': 'ISO-8859-1,utf-8;q=0.7,*;q=0.7',
-                'Connection': 'keep-alive',
-            },
-            'cookiefile': None,
-            'age_limit': 99,
-            'sleep_interval': 1,
-            'max_sleep_interval': 5,
-            'sleep_interval_subtitles': 1,
+            **BASE_OPTS,
+            'cookiefile': cookiefile,
+            # Fetch DASH/HLS fragments in parallel, in large HTTP chunks
+            'concurrent_fragment_downloads': FRAGMENT_WORKERS,
+            'http_chunk_size': 10 << 20,
+            'buffersize': 1 << 20,
             # Retry on errors
             'retries': 3,
-            'fragment_retries': 3,
+            'fragment_retries': 5,
+            'file_access_retries': 3,
             'skip_unavailable_fragments': True,
             # Use different extractors as fallback
             'extractor_retries': 3,
         }
 
+        # Anonymous requests need pacing to stay clear of 403s; signed-in ones don't
+        if not cookiefile:
+            base_opts.update({
+                'sleep_interval': 1,
+                'max_sleep_interval': 5,
+                'sleep_interval_subtitles': 1,
+            })
+
         # Configure download options based on format choice
         if format_choice.startswith('bestaudio'):
             ydl_opts = {
@@ -313,76 +484,277 @@ class StreamlitYouTubeDownloader:
                 }],
             }
         else:
-            # Try multiple format strategies
-            format_options = [
-                format_choice,
-                'best[height<=1080][ext=mp4]/best[height<=1080]/best[ext=mp4]/best',
-                'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-                'best'
-            ]
+            # Selections from get_format_from_selection carry their own fallbacks;
+            # a bare format id only needs one
+            format_spec = format_choice if '/' in format_choice else f"{format_choice}/best[ext=mp4]/best"
 
             ydl_opts = {
                 **base_opts,
-                'format': '/'.join(format_options),
+                'format': format_spec,
                 'merge_output_format': 'mp4',
+                # Among equally good streams pick H.264 video and AAC/m4a audio, which mux into mp4 without re-encoding
+                'format_sort': ['res', 'fps', 'codec:h264:m4a'],
             }
 
         # Add trimming options if specified
         if start_time is not None or end_time is not None:
-            postprocessor_args = []
+            # yt-dlp hands the section to ffmpeg, which seeks in the remote stream and copies
+            # just that part, so the rest of the video is never downloaded
+            ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(
+                None, [(start_time or 0, end_time if end_time is not None else float('inf'))]
+            )
+            # Re-encode around the cuts only when the user asked for a frame-accurate trim
+            ydl_opts['force_keyframes_at_cuts'] = accurate_trim
+
+        # The progress hook only sees pre-merge files, so record the final path after yt-dlp moves it
+        final_path = FinalPathRecorder()
+
+        # Extraction is the expensive part of a fresh YoutubeDL, so refresh stale metadata
+        # on the long-lived shared one instead and let the download client only download
+        meta_file = self.get_meta_file(url, cookiefile)
+        if meta_file is not None and not is_meta_fresh(meta_file):
+            # The memoized info can outlive the file it was read from; drop it so this really re-extracts
+            fetch_video_info.clear(url, meta_file, cookiefile)
+            self.get_video_info(url, cookiefile)
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.add_post_processor(final_path, when='after_move')
+            # Download from the cached metadata so yt-dlp skips a second extraction;
+            # it falls back to the URL itself if the cached stream URLs have expired
+            if is_meta_fresh(meta_file):
+                ydl.download_with_info_file(str(meta_file))
+            else:
+                ydl.download([url])
 
-            if start_time is not None:
-                postprocessor_args.extend(['-ss', str(start_time)])
+        return final_path.filepath
+
+    def show_download_error(self, error):
+        """Explain a failed download to the user"""
+        error_msg = str(error)
+        if isinstance(error, yt_dlp.DownloadError) and ("403" in error_msg or "Forbidden" in error_msg):
+            st.error("❌ YouTube blocked the download (403 Forbidden)")
+            st.info("💡 Try these solutions:")
+            st.write("1. Wait a few minutes and try again")
+            st.write("2. Try a different video")
+            st.write("3. Use a VPN to change your IP")
+            st.write("4. Update yt-dlp: `pip install --upgrade yt-dlp`")
+        else:
+            st.error(f"Download failed: {error_msg}")
 
-            if end_time is not None:
-                if start_time is not None:
-                    duration = end_time - start_time
-                    postprocessor_args.extend(['-t', str(duration)])
-                else:
-                    postprocessor_args.extend(['-to', str(end_time)])
+    @st.fragment
+    def download_options_ui(self, url, ffmpeg_available):
+        """Format and trim choices; changing them only reruns this part of the page"""
+        st.markdown("---")
+        st.header("⚙️ Download Options")
 
-            # Add FFmpeg postprocessor for trimming
-            if 'postprocessors' not in ydl_opts:
-                ydl_opts['postprocessors'] = []
+        col1, col2 = st.columns(2)
 
-            ydl_opts['postprocessors'].append({
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4',
-            })
+        with col1:
+            st.subheader("📺 Format Selection")
 
-            ydl_opts['postprocessor_args'] = {
-                'ffmpeg': postprocessor_args
-            }
+            # Create format options
+            selected_format = st.selectbox(
+                "Choose quality:",
+                st.session_state.format_options,
+                help="Select your preferred video quality or audio-only option"
+            )
 
-        try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+            # Show format details
+            if selected_format.startswith("🎯"):
+                st.info("🎯 **Best Available Quality** - Automatically selects the highest quality format")
+            elif selected_format.startswith("🎵"):
+                st.info("🎵 **Audio Only** | MP3 | ~3-5MB per minute")
+            else:
+                st.info(f"📺 Selected: **{selected_format}**")
+
+        with col2:
+            st.subheader("✂️ Trimming Options")
+
+            enable_trim = st.checkbox("Enable trimming", disabled=not ffmpeg_available)
+            duration = st.session_state.video_info.get('duration', 0)
+            show_trim = enable_trim and ffmpeg_available and bool(duration)
+
+            if enable_trim and ffmpeg_available:
+                if duration:
+                    st.write(f"**Video Duration:** {self.format_duration(duration)}")
+                else:
+                    st.warning("⚠️ Video duration unknown - trimming may not work")
+
+        # Trim inputs and the download button share a form so typing doesn't rerun the page
+        with st.form("download_form", border=False):
+            start_time, end_time = None, None
+            accurate_trim = False
+
+            if show_trim:
+                # Time input columns
+                time_col1, time_col2 = st.columns(2)
+
+                with time_col1:
+                    start_time_str = st.text_input(
+                        "Start time:",
+                        placeholder="0:30 or 30",
+                        help="Format: MM:SS, HH:MM:SS, or seconds"
+                    )
+
+                with time_col2:
+                    end_time_str = st.text_input(
+                        "End time:",
+                        placeholder="2:30 or 150",
+                        help="Format: MM:SS, HH:MM:SS, or seconds"
+                    )
+
+                accurate_trim = st.checkbox(
+                    "Accurate trim (re-encode)",
+                    help="Cut on the exact frame instead of the nearest keyframe. Much slower."
+                )
+
+                # Parse times
+                start_time = self.parse_time(start_time_str) if start_time_str else None
+                end_time = self.parse_time(end_time_str) if end_time_str else None
 
-            # Find the downloaded file
-            downloaded_files = list(self.download_path.glob(f"{safe_title}.*"))
-            if downloaded_files:
-                return downloaded_files[0]
+            # Download button
+            st.markdown("---")
+            col1, col2, col3 = st.columns([1, 2, 1])
+
+            with col2:
+                submitted = st.form_submit_button("🚀 Download Video", type="primary", use_container_width=True,
+                                                  disabled='download_future' in st.session_state)
+
+        if submitted:
+            format_id = self.get_format_from_selection(selected_format, st.session_state.formats_by_res)
+            title = st.session_state.video_info.get('title', 'Unknown')
+            label = "Downloading..."
+
+            # Validate trimming settings
+            trim_valid = True
+            if show_trim:
+                if start_time is not None or end_time is not None:
+                    # Keep a trim preview for the progress panel
+                    start_display = self.format_duration(start_time) if start_time else "Beginning"
+                    end_display = self.format_duration(end_time) if end_time else "End"
+                    trim_duration = (end_time or duration) - (start_time or 0)
+                    label = (f"Downloading ✂️ {start_display} → {end_display} "
+                             f"({self.format_duration(trim_duration)})...")
+
+                if start_time and start_time >= duration:
+                    st.error("❌ Invalid start time")
+                    trim_valid = False
+                elif end_time and end_time > duration:
+                    st.error("❌ Invalid end time")
+                    trim_valid = False
+                elif start_time and end_time and end_time <= start_time:
+                    st.error("❌ Invalid time range")
+                    trim_valid = False
+
+            if trim_valid:
+                # Download the video on a worker thread; it reports progress through the queue
+                progress_queue = queue.Queue(maxsize=1)
+                st.session_state.download_queue = progress_queue
+                st.session_state.download_progress = (0, 0)
+                st.session_state.download_label = label
+                st.session_state.download_result = None
+
+                def report_progress(downloaded, total):
+                    # Replace any update the page hasn't picked up yet; only the latest matters
+                    try:
+                        progress_queue.get_nowait()
+                    except queue.Empty:
+                        pass
+                    progress_queue.put_nowait((downloaded, total))
+
+                # A repeat of a download from earlier in this session reuses that file
+                download_key = (st.session_state.video_info.get('id'), format_id,
+                                start_time, end_time, accurate_trim)
+                st.session_state.download_key = download_key
+                previous = st.session_state.downloaded.get(download_key)
+
+                if previous and previous.exists():
+                    st.session_state.download_result = (previous, None)
+                else:
+                    st.session_state.download_future = get_executor().submit(
+                        self.download_video,
+                        url, format_id, title,
+                        start_time, end_time,
+                        report_progress, accurate_trim,
+                        st.session_state.cookiefile
+                    )
+
+                # Rerun the whole page so the results area picks up the new job
+                st.rerun()
+
+    @st.fragment(run_every=POLL_INTERVAL)
+    def download_progress_ui(self):
+        """Report on the background download without rerunning the rest of the page"""
+        future = st.session_state.get('download_future')
+        if future is None:
+            return
+
+        if future.done():
+            del st.session_state.download_future
+            try:
+                downloaded_file = future.result()
+            except Exception as e:
+                st.session_state.download_result = (None, e)
             else:
-                return None
-
-        except yt_dlp.DownloadError as e:
-            error_msg = str(e)
-            if "403" in error_msg or "Forbidden" in error_msg:
-                st.error("❌ YouTube blocked the download (403 Forbidden)")
-                st.info("💡 Try these solutions:")
-                st.write("1. Wait a few minutes and try again")
-                st.write("2. Try a different video")
-                st.write("3. Use a VPN to change your IP")
-                st.write("4. Update yt-dlp: `pip install --upgrade yt-dlp`")
+                st.session_state.download_result = (downloaded_file, None)
+                if downloaded_file:
+                    st.session_state.downloaded[st.session_state.download_key] = downloaded_file
+
+            # Stop polling and show the result
+            st.rerun()
+
+        try:
+            st.session_state.download_progress = st.session_state.download_queue.get_nowait()
+        except queue.Empty:
+            pass
+        downloaded, total = st.session_state.download_progress
+
+        with st.status(st.session_state.download_label, expanded=True):
+            if total:
+                st.progress(min(downloaded / total, 1.0))
+                st.text(f"Downloading... {downloaded / total * 100:.1f}% "
+                        f"({self.format_filesize(downloaded)} of {self.format_filesize(total)})")
             else:
-                st.error(f"Download failed: {error_msg}")
-            return None
-        except Exception as e:
-            st.error(f"Download failed: {str(e)}")
-            return None
+                st.progress(0)
+                st.text("Starting download...")
+
+    def show_download_result(self):
+        """Offer the finished download, or explain why it failed"""
+        downloaded_file, error = st.session_state.download_result
+        if error is not None:
+            self.show_download_error(error)
+            return
+        if not downloaded_file:
+            st.error("❌ Download failed")
+            return
+
+        file_bytes = downloaded_file.stat().st_size
+        file_size = self.format_filesize(file_bytes)
+        if st.get_option("server.enableStaticServing") and file_bytes <= STATIC_MAX_SIZE:
+            # Link straight to the static file so the web server sends it from disk
+            file_url = f"./app/static/{urllib.parse.quote(downloaded_file.name)}"
+            st.markdown(
+                f'<a href="{file_url}" download>📥 Download File ({file_size})</a>',
+                unsafe_allow_html=True
+            )
+        else:
+            # Show download button; the file is only read when the user clicks it
+            st.download_button(
+                label=f"📥 Download File ({file_size})",
+                data=downloaded_file.read_bytes,
+                file_name=downloaded_file.name,
+                mime=mimetypes.guess_type(downloaded_file.name)[0] or "application/octet-stream",
+                # Clicking doesn't need to rerun the page, which would also clear this result
+                on_click="ignore",
+                use_container_width=True
+            )
+
+        st.success(f"🎉 Successfully downloaded: {downloaded_file.name}")
 
     def run_streamlit_app(self):
         """Main Streamlit application"""
+        # Set while a background job is running so the page keeps polling it
+        poll = False
 
         # Header
         st.title("🎥 YouTube Downloader Pro")
@@ -393,18 +765,24 @@ class StreamlitYouTubeDownloader:
             st.header("⚙️ Settings")
 
             # Check FFmpeg
-            try:
-                subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+            ffmpeg_available = check_ffmpeg()
+            if ffmpeg_available:
                 st.success("✅ FFmpeg installed - Trimming enabled")
-                ffmpeg_available = True
-            except (subprocess.CalledProcessError, FileNotFoundError):
+            else:
                 st.warning("⚠️ FFmpeg not found - Trimming disabled")
                 st.info("Install FFmpeg to enable video trimming")
-                ffmpeg_available = False
+
+            # Signed-in cookies let YouTube skip its bot checks, which cause most 403s
+            cookies_upload = st.file_uploader(
+                "cookies.txt (optional)",
+                type=["txt"],
+                help="Netscape-format cookies exported from a browser signed in to YouTube"
+            )
+            self.save_cookies(cookies_upload)
 
             st.markdown("---")
             st.header("📊 Statistics")
-            download_count = len(list(self.download_path.glob("*")))
+            download_count = count_downloads(str(self.download_path))
             st.metric("Total Downloads", download_count)
 
         # Main content
@@ -419,22 +797,40 @@ class StreamlitYouTubeDownloader:
                 placeholder="https://www.youtube.com/watch?v=...",
                 help="Enter a valid YouTube URL"
             )
+            # Equivalent URLs share one metadata cache entry
+            url = normalize_url(url) if url else url
 
             # Fetch video info button
-            if st.button("🔍 Get Video Info", type="primary"):
-                if url and ('youtube.com' in url or 'youtu.be' in url):
-                    with st.spinner("Fetching video information..."):
-                        info = self.get_video_info(url)
+            if st.button("🔍 Get Video Info", type="primary", disabled='info_future' in st.session_state):
+                if url and YOUTUBE_URL_RE.match(url):
+                    st.session_state.info_future = get_executor().submit(
+                        self.get_video_info, url, st.session_state.cookiefile
+                    )
+                else:
+                    st.error("❌ Please enter a valid YouTube URL")
+
+            # Report on the background metadata fetch without blocking the page
+            if 'info_future' in st.session_state:
+                future = st.session_state.info_future
+                with st.status("Fetching video information...", expanded=True) as status:
+                    if not future.done():
+                        poll = True
+                    else:
+                        del st.session_state.info_future
+                        try:
+                            info = future.result()
+                        except Exception as e:
+                            st.error(f"Error getting video info: {str(e)}")
+                            info = None
+
                         if info:
                             st.session_state.video_info = info
-                            st.session_state.formats = self.get_available_formats(info)
-                            st.success("✅ Video information loaded!")
+                            self.set_formats(info)
+                            status.update(label="✅ Video information loaded!", state="complete")
                         else:
-                            st.error("❌ Could not fetch video information")
                             st.session_state.video_info = None
-                            st.session_state.formats = []
-                else:
-                    st.error("❌ Please enter a valid YouTube URL")
+                            self.set_formats(None)
+                            status.update(label="❌ Could not fetch video information", state="error")
 
         with col2:
             if st.session_state.video_info:
@@ -455,146 +851,16 @@ class StreamlitYouTubeDownloader:
 
         # Download options (only show if video info is available)
         if st.session_state.video_info and st.session_state.formats:
-            st.markdown("---")
-            st.header("⚙️ Download Options")
+            self.download_options_ui(url, ffmpeg_available)
 
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.subheader("📺 Format Selection")
-
-                # Create format options
-                options = self.create_download_options(st.session_state.formats)
-                selected_format = st.selectbox(
-                    "Choose quality:",
-                    options,
-                    help="Select your preferred video quality or audio-only option"
-                )
-
-                # Show format details
-                if selected_format.startswith("🎯"):
-                    st.info("🎯 **Best Available Quality** - Automatically selects the highest quality format")
-                elif selected_format.startswith("🎵"):
-                    st.info("🎵 **Audio Only** | MP3 | ~3-5MB per minute")
-                else:
-                    st.info(f"📺 Selected: **{selected_format}**")
-
-            with col2:
-                st.subheader("✂️ Trimming Options")
-
-                enable_trim = st.checkbox("Enable trimming", disabled=not ffmpeg_available)
-
-                if enable_trim and ffmpeg_available:
-                    duration = st.session_state.video_info.get('duration', 0)
-
-                    if duration:
-                        st.write(f"**Video Duration:** {self.format_duration(duration)}")
-
-                        # Time input columns
-                        time_col1, time_col2 = st.columns(2)
-
-                        with time_col1:
-                            start_time_str = st.text_input(
-                                "Start time:",
-                                placeholder="0:30 or 30",
-                                help="Format: MM:SS, HH:MM:SS, or seconds"
-                            )
-
-                        with time_col2:
-                            end_time_str = st.text_input(
-                                "End time:",
-                                placeholder="2:30 or 150",
-                                help="Format: MM:SS, HH:MM:SS, or seconds"
-                            )
-
-                        # Parse and validate times
-                        start_time = self.parse_time(start_time_str) if start_time_str else None
-                        end_time = self.parse_time(end_time_str) if end_time_str else None
-
-                        # Show trim preview
-                        if start_time is not None or end_time is not None:
-                            start_display = self.format_duration(start_time) if start_time else "Beginning"
-                            end_display = self.format_duration(end_time) if end_time else "End"
-                            trim_duration = (end_time or duration) - (start_time or 0)
-
-                            st.success(f"✂️ **Trim:** {start_display} → {end_display}")
-                            st.info(f"📏 **Result Duration:** {self.format_duration(trim_duration)}")
-
-                            # Validation
-                            if start_time and start_time >= duration:
-                                st.error("❌ Start time is beyond video duration")
-                            elif end_time and end_time > duration:
-                                st.error("❌ End time is beyond video duration")
-                            elif start_time and end_time and end_time <= start_time:
-                                st.error("❌ End time must be after start time")
-                    else:
-                        st.warning("⚠️ Video duration unknown - trimming may not work")
-                        start_time, end_time = None, None
-                else:
-                    start_time, end_time = None, None
-
-            # Download button
-            st.markdown("---")
+            # Results go outside the options form, which can't hold a download button
             col1, col2, col3 = st.columns([1, 2, 1])
 
             with col2:
-                if st.button("🚀 Download Video", type="primary", use_container_width=True):
-                    format_id = self.get_format_from_selection(selected_format, st.session_state.formats)
-                    title = st.session_state.video_info.get('title', 'Unknown')
-
-                    # Validate trimming settings
-                    trim_valid = True
-                    if enable_trim and ffmpeg_available:
-                        duration = st.session_state.video_info.get('duration', 0)
-                        if start_time and start_time >= duration:
-                            st.error("❌ Invalid start time")
-                            trim_valid = False
-                        elif end_time and end_time > duration:
-                            st.error("❌ Invalid end time")
-                            trim_valid = False
-                        elif start_time and end_time and end_time <= start_time:
-                            st.error("❌ Invalid time range")
-                            trim_valid = False
-
-                    if trim_valid:
-                        # Create progress bar
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-
-                        def update_progress(progress):
-                            progress_bar.progress(progress)
-                            status_text.text(f"Downloading... {progress * 100:.1f}%")
-
-                        status_text.text("Starting download...")
-
-                        # Download the video
-                        use_start_time = start_time if enable_trim and ffmpeg_available else None
-                        use_end_time = end_time if enable_trim and ffmpeg_available else None
-
-                        downloaded_file = self.download_video(
-                            url, format_id, title,
-                            use_start_time, use_end_time,
-                            update_progress
-                        )
-
-                        if downloaded_file:
-                            progress_bar.progress(1.0)
-                            status_text.text("✅ Download completed!")
-
-                            # Show download button
-                            with open(downloaded_file, "rb") as file:
-                                st.download_button(
-                                    label="📥 Download File",
-                                    data=file.read(),
-                                    file_name=downloaded_file.name,
-                                    mime="video/mp4" if not format_id.startswith('bestaudio') else "audio/mpeg",
-                                    use_container_width=True
-                                )
-
-                            st.success(f"🎉 Successfully downloaded: {downloaded_file.name}")
-                        else:
-                            progress_bar.empty()
-                            status_text.text("❌ Download failed")
+                if 'download_future' in st.session_state:
+                    self.download_progress_ui()
+                elif st.session_state.download_result:
+                    self.show_download_result()
 
         # Footer
         st.markdown("---")
@@ -608,6 +874,11 @@ class StreamlitYouTubeDownloader:
             unsafe_allow_html=True
         )
 
+        # Rerun once the whole page has rendered to pick up background progress
+        if poll:
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+
 
 def main():
     """Main function to run the Streamlit app"""
@@ -4,57 +4,305 @@ YouTube Video Downloader
 A simple Python app to download YouTube videos in different resolutions
 """
 
+import argparse
+import asyncio
+import gzip
+import hashlib
+import importlib.util
+import json
 import os
+import queue
+import re
+import shutil
 import sys
-import yt_dlp
+import tempfile
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from operator import itemgetter
 from pathlib import Path
 
+# Batch downloads run in parallel; keep their status lines from interleaving
+PRINT_LOCK = threading.Lock()
+URL_SEPARATOR_RE = re.compile(r'[\s,]+')
+YOUTUBE_URL_RE = re.compile(
+    r'^(?:https?://)?(?:www\.|m\.|music\.)?'
+    r'(?:youtube\.com/(?:watch|shorts/|embed/|live/|playlist)|youtu\.be/)'
+)
+# Batch downloads start two at a time and adapt between these limits
+MIN_PARALLEL_DOWNLOADS = 1
+START_PARALLEL_DOWNLOADS = 2
+MAX_PARALLEL_DOWNLOADS = 8
+# A change to the limit is only kept if it raises total throughput this much
+THROUGHPUT_GAIN = 1.15
+# Seconds of downloading measured before each change to the limit
+SCHEDULER_WINDOW = 5
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+# In native-audio mode only a non-m4a fallback stream is converted, so the file always matches the m4a label
+NATIVE_AUDIO_CONVERSION = 'webm>m4a/opus>m4a/ogg>m4a/mp3>m4a'
+# Cached video information is reused for an hour
+META_TTL = 3600
+# Temp files only go to tmpfs when it has room for a large video
+TMPFS_MIN_FREE = 2 << 30
+# Seconds between redraws of the progress line
+PROGRESS_INTERVAL = 0.1
+
+
+def load_yt_dlp():
+    """Import yt-dlp on first use; it loads hundreds of extractor modules, which slows startup"""
+    import yt_dlp
+    return yt_dlp
+
+
+class SafeTitleTable(dict):
+    """str.translate table keeping letters, digits, spaces, '-' and '_'; filled in as characters are seen"""
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        self[codepoint] = codepoint if char.isalnum() or char in ' -_' else None
+        return self[codepoint]
+
+
+SAFE_TITLE_TABLE = SafeTitleTable()
+
+
+class DownloadScheduler:
+    """Limits parallel downloads, raising the limit for as long as that raises total throughput"""
+
+    def __init__(self, adaptive=True):
+        self.limit = START_PARALLEL_DOWNLOADS
+        self.running = 0
+        self.stopped = False
+        self.condition = threading.Condition()
+        # Bytes downloaded by all running downloads since the window started
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.seen_bytes = {}
+        # Throughput measured under the previous limit
+        self.last_throughput = None
+        # Once a change has been undone the limit stays put; without adapting it stays at the start value
+        self.settled = not adaptive
+
+    def acquire(self):
+        """Wait until another download may start, or the batch is stopped"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.stopped or self.running < self.limit)
+            self.running += 1
+
+    def stop(self):
+        """Wake every waiting download so it can see the batch was stopped"""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+
+    def release(self):
+        """Free the slot of a finished download"""
+        with self.condition:
+            self.running -= 1
+            self.condition.notify_all()
+
+    def record(self, d):
+        """Progress hook counting downloaded bytes; adjusts the limit at the end of each window"""
+        if self.settled or d['status'] not in ('downloading', 'finished'):
+            return
+
+        key = d.get('tmpfilename') or d.get('filename')
+        downloaded = d.get('downloaded_bytes') or 0
+        now = time.monotonic()
+        with self.condition:
+            self.window_bytes += max(downloaded - self.seen_bytes.get(key, 0), 0)
+            if d['status'] == 'finished':
+                self.seen_bytes.pop(key, None)
+            else:
+                self.seen_bytes[key] = downloaded
+
+            if now - self.window_start < SCHEDULER_WINDOW:
+                return
+            throughput = self.window_bytes / (now - self.window_start)
+            saturated = self.running >= self.limit
+            self.window_start, self.window_bytes = now, 0
+
+            # With fewer downloads left than the limit, this window says nothing about it
+            if not saturated:
+                return
+
+            # Keep raising the limit while the last raise paid off, otherwise undo it and stop there
+            if self.last_throughput is not None and throughput <= self.last_throughput * THROUGHPUT_GAIN:
+                self.limit = max(self.limit - 1, MIN_PARALLEL_DOWNLOADS)
+                self.settled = True
+                return
+            if self.limit >= MAX_PARALLEL_DOWNLOADS:
+                self.settled = True
+                return
+            self.last_throughput = throughput
+            self.limit += 1
+            self.condition.notify_all()
+
 
 class YouTubeDownloader:
-    def __init__(self):
+    def __init__(self, keep_native_audio=False):
         self.download_path = Path("downloads")
         self.download_path.mkdir(exist_ok=True)
+        # Native audio saves the m4a (AAC) stream as is instead of encoding an MP3
+        self.keep_native_audio = keep_native_audio
+        self.audio_ext = 'm4a' if keep_native_audio else 'mp3'
+        self.cache_dir = Path.home() / ".cache" / "yt_downloader"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Parts and fragments go to RAM when tmpfs is available, so only the finished file is written to disk
+        # mkdtemp gives each run its own private (0700) directory, so other users can't read or redirect it
+        shm = Path('/dev/shm')
+        tmp_base = shm if shm.is_dir() and shutil.disk_usage(shm).free >= TMPFS_MIN_FREE else self.download_path
+        self.tmp_dir = Path(tempfile.mkdtemp(prefix='.yt_dl_', dir=tmp_base))
+        # Anything left on tmpfs would hold RAM until reboot
+        self.remove_tmp_dir = weakref.finalize(self, shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        # Idle YoutubeDL instances for metadata lookups, reused so their connections stay warm
+        self.ydl_pool = {}
+        self.ydl_pool_lock = threading.Lock()
+        # The top format starts downloading while the user is still choosing, once they've shown they usually pick it
+        self.prefetch_executor = ThreadPoolExecutor(max_workers=1)
+        self.prefetch = None
+        self.picked_top_format = False
+        self.prefetch_hits = 0
+        self.prefetch_misses = 0
+        # aria2c splits a download over many connections, which gets around per-connection throttling
+        self.aria2c_available = shutil.which('aria2c') is not None
+        # Latest progress of each running download, keyed by title
+        self.progress = {}
+        self.progress_shown = 0
+
+    @contextmanager
+    def pooled_ydl(self, flat):
+        """Borrow a metadata YoutubeDL; each one serves a single thread at a time"""
+        with self.ydl_pool_lock:
+            idle = self.ydl_pool.setdefault(flat, [])
+            ydl = idle.pop() if idle else None
+
+        if ydl is None:
+            ydl = load_yt_dlp().YoutubeDL({
+                'quiet': True,
+                'no_warnings': True,
+                'cachedir': str(self.cache_dir / 'ytdlp'),
+                'extract_flat': 'in_playlist' if flat else False,
+            })
 
-    def get_video_info(self, url):
-        """Get video information and available formats"""
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-        }
+        try:
+            yield ydl
+        finally:
+            with self.ydl_pool_lock:
+                idle.append(ydl)
+
+    def close(self):
+        """Close the pooled YoutubeDL instances and remove the temp directory"""
+        with self.ydl_pool_lock:
+            for idle in self.ydl_pool.values():
+                for ydl in idle:
+                    ydl.close()
+            self.ydl_pool.clear()
+        self.remove_tmp_dir()
+
+    @contextmanager
+    def job_tmp_dir(self):
+        """Temp directory for one download; removing it also frees parts left by a failed download"""
+        path = Path(tempfile.mkdtemp(dir=self.tmp_dir))
+        try:
+            yield path
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def get_video_info(self, url, flat=False):
+        """Get video information and available formats; with flat, playlists only list their entries"""
+        # Entering the same URL again (e.g. to pick another format) skips the network
+        key = f"{url}|flat" if flat else url
+        cache_file = self.cache_dir / f"{hashlib.sha1(key.encode()).hexdigest()}.json.gz"
+        try:
+            if time.time() - cache_file.stat().st_mtime < META_TTL:
+                with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+                    return json.load(f)
+        except (OSError, EOFError, ValueError):
+            # A truncated gzip raises EOFError; treat it like any other unreadable entry
+            pass
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                return info
+            with self.pooled_ydl(flat) as ydl:
+                info = ydl.sanitize_info(ydl.extract_info(url, download=False))
         except Exception as e:
             print(f"Error getting video info: {str(e)}")
             return None
 
+        # Write to a temp file and rename it into place, so readers never see a partial entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        except OSError:
+            return info
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                json.dump(info, f)
+            os.replace(tmp_path, cache_file)
+        except OSError:
+            pass
+        finally:
+            Path(tmp_path).unlink(missing_ok=True)
+
+        return info
+
+    async def get_video_info_async(self, url):
+        """Get video information without blocking the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_video_info, url)
+
+    async def get_video_infos_async(self, urls):
+        """Get information for several videos at once"""
+        return await asyncio.gather(*(self.get_video_info_async(url) for url in urls))
+
+    def get_video_infos(self, urls):
+        """Get information for several videos, fetching them concurrently"""
+        return asyncio.run(self.get_video_infos_async(urls))
+
+    def choose_playlist_entry(self, info):
+        """List a playlist's videos and return the URL of the one the user picks"""
+        entries = [e for e in info.get('entries') or () if e]
+        if not entries:
+            print("❌ This playlist has no videos.")
+            return None
+
+        print(f"\n📃 Playlist: {info.get('title', 'Unknown Playlist')}")
+        print("=" * 60)
+        for i, entry in enumerate(entries, 1):
+            print(f"{i:<4} {entry.get('title') or entry.get('id', 'Unknown')}")
+        print("-" * 60)
+
+        while True:
+            choice = input(f"\nSelect video (1-{len(entries)}, or Enter to cancel): ").strip()
+            if not choice:
+                return None
+            if choice.isdecimal() and 1 <= int(choice) <= len(entries):
+                entry = entries[int(choice) - 1]
+                return entry.get('url') or f"https://www.youtube.com/watch?v={entry['id']}"
+            print(f"Please enter a number between 1 and {len(entries)}")
+
     def get_available_formats(self, info):
         """Extract available video formats and resolutions"""
-        formats = []
-        seen_resolutions = set()
-
-        if 'formats' in info:
-            for f in info['formats']:
-                if f.get('vcodec') != 'none' and f.get('acodec') != 'none':  # Has both video and audio
-                    height = f.get('height')
-                    if height and height not in seen_resolutions:
-                        formats.append({
-                            'format_id': f['format_id'],
-                            'resolution': f"{height}p",
-                            'height': height,
-                            'ext': f.get('ext', 'mp4'),
-                            'filesize': f.get('filesize', 'Unknown'),
-                            'fps': f.get('fps', 'Unknown'),
-                            'vcodec': f.get('vcodec', 'Unknown'),
-                            'acodec': f.get('acodec', 'Unknown')
-                        })
-                        seen_resolutions.add(height)
+        # First format seen at each height wins; dicts keep insertion order
+        by_height = {}
+        for f in info.get('formats', ()):
+            height = f.get('height')
+            if not height or height in by_height:
+                continue
+            if f.get('vcodec') != 'none' != f.get('acodec'):  # Has both video and audio
+                by_height[height] = {
+                    'format_id': f['format_id'],
+                    'resolution': f"{height}p",
+                    'height': height,
+                    'ext': f.get('ext', 'mp4'),
+                    'filesize': f.get('filesize', 'Unknown'),
+                    'fps': f.get('fps', 'Unknown'),
+                    'vcodec': f.get('vcodec', 'Unknown'),
+                    'acodec': f.get('acodec', 'Unknown')
+                }
 
         # Sort by resolution (highest first)
-        formats.sort(key=lambda x: x['height'], reverse=True)
-        return formats
+        return sorted(by_height.values(), key=itemgetter('height'), reverse=True)
 
     def format_filesize(self, size):
         """Convert bytes to human readable format"""
@@ -63,61 +311,277 @@ class YouTubeDownloader:
 
         try:
             size = int(size)
-            for unit in ['B', 'KB', 'MB', 'GB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            return f"{size:.1f} TB"
-        except:
+        except (TypeError, ValueError):
             return "Unknown"
 
+        if size <= 0:
+            return "0.0 B"
+
+        # Each unit step is 10 bits, so the bit length picks the unit directly
+        unit = min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size / (1 << (10 * unit)):.1f} {SIZE_UNITS[unit]}"
+
     def display_formats(self, formats, title):
         """Display available formats to user"""
-        print(f"\nVideo: {title}")
-        print("=" * 60)
-        print(f"{'#':<3} {'Resolution':<12} {'Format':<8} {'Size':<12} {'FPS':<6}")
-        print("-" * 60)
-
+        # Build the whole table and write it in one go
+        lines = [
+            f"\nVideo: {title}",
+            "=" * 60,
+            f"{'#':<3} {'Resolution':<12} {'Format':<8} {'Size':<12} {'FPS':<6}",
+            "-" * 60,
+        ]
         for i, fmt in enumerate(formats, 1):
             size_str = self.format_filesize(fmt['filesize'])
             fps_str = str(fmt['fps']) if fmt['fps'] != 'Unknown' else 'N/A'
-            print(f"{i:<3} {fmt['resolution']:<12} {fmt['ext']:<8} {size_str:<12} {fps_str:<6}")
+            lines.append(f"{i:<3} {fmt['resolution']:<12} {fmt['ext']:<8} {size_str:<12} {fps_str:<6}")
+        lines.append(f"{len(formats) + 1:<3} {'Audio Only':<12} {self.audio_ext:<8} {'N/A':<12} {'N/A':<6}")
+        lines.append("-" * 60)
+
+        sys.stdout.write("\n".join(lines) + "\n")
+
+    def make_safe_title(self, title):
+        """Clean a title for use as a filename"""
+        return title.translate(SAFE_TITLE_TABLE).rstrip()[:50]  # Limit filename length
+
+    def start_prefetch(self, url, format_id):
+        """Start downloading a format in the background before the user picks it"""
+        self.cancel_prefetch()
+        tmp_dir = Path(tempfile.mkdtemp(prefix='yt_prefetch_', dir=self.tmp_dir))
+        cancel = threading.Event()
+        # Progress is only drawn once the user is waiting on it, not over the format prompt
+        show = threading.Event()
+        future = self.prefetch_executor.submit(self.prefetch_format, url, format_id, tmp_dir, cancel, show)
+        self.prefetch = (future, format_id, tmp_dir, cancel, show)
+
+    def prefetch_format(self, url, format_id, tmp_dir, cancel, show):
+        """Download a format into a temp directory; returns the file or None"""
+        def check_cancelled(d):
+            if cancel.is_set():
+                raise load_yt_dlp().utils.DownloadCancelled()
+            if show.is_set():
+                self.report_progress(self.make_safe_title(d['info_dict'].get('title') or ''), d)
 
-        print(f"{len(formats) + 1:<3} {'Audio Only':<12} {'mp3':<8} {'N/A':<12} {'N/A':<6}")
-        print("-" * 60)
+        ydl_opts = {
+            'format': format_id,
+            'outtmpl': str(tmp_dir / '%(id)s.%(ext)s'),
+            'cachedir': str(self.cache_dir / 'ytdlp'),
+            'concurrent_fragment_downloads': 4,
+            'quiet': True,
+            'no_warnings': True,
+            'noprogress': True,
+            'progress_hooks': [check_cancelled],
+        }
 
-    def download_video(self, url, format_choice, title):
-        """Download video with selected format"""
-        # Clean title for filename
-        safe_title = "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-        safe_title = safe_title[:50]  # Limit filename length
-
-        if format_choice == 'audio':
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'outtmpl': str(self.download_path / f'{safe_title}.%(ext)s'),
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
+        try:
+            with load_yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                ydl.download([url])
+        except Exception:
+            return None
+
+        files = [f for f in tmp_dir.iterdir() if f.suffix not in ('.part', '.ytdl')]
+        return files[0] if len(files) == 1 else None
+
+    def cancel_prefetch(self):
+        """Stop the background download and throw away what it fetched"""
+        if self.prefetch is None:
+            return
+
+        future, format_id, tmp_dir, cancel, show = self.prefetch
+        self.prefetch = None
+        cancel.set()
+        future.cancel()
+        future.add_done_callback(lambda f: shutil.rmtree(tmp_dir, ignore_errors=True))
+
+    def use_prefetch(self, format_choice, title):
+        """Finish the background download if it matches the chosen format"""
+        if self.prefetch is None:
+            return False
+
+        future, format_id, tmp_dir, cancel, show = self.prefetch
+        if format_choice != format_id:
+            self.prefetch_misses += 1
+            self.cancel_prefetch()
+            # Let it stop before the chosen format starts, so the two don't share the bandwidth
+            wait([future])
+            return False
+
+        if not future.done():
+            print("⏳ Finishing the download started in the background...")
+            show.set()
+        # Stays registered while waiting, so Ctrl-C here still cancels it through cancel_prefetch
+        prefetched = future.result()
+        self.prefetch = None
+        if prefetched is None:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return False
+
+        target = self.download_path / f"{self.make_safe_title(title)}{prefetched.suffix}"
+        # Like yt-dlp, leave an existing file alone instead of overwriting it
+        if target.exists():
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"\r\033[K✅ {target.name} has already been downloaded")
+            return True
+
+        shutil.move(str(prefetched), str(target))
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        self.prefetch_hits += 1
+        print(f"\r\033[K✅ Download completed successfully: {target.name}")
+        return True
+
+    def report_progress(self, name, d):
+        """Redraw one status line showing every running download"""
+        if d['status'] != 'downloading':
+            with PRINT_LOCK:
+                self.progress.pop(name, None)
+            return
+
+        total = d.get('total_bytes') or d.get('total_bytes_estimate')
+        downloaded = d.get('downloaded_bytes') or 0
+        now = time.monotonic()
+        with PRINT_LOCK:
+            self.progress[name] = f"{downloaded / total * 100:5.1f}%" if total else self.format_filesize(downloaded)
+            if now - self.progress_shown < PROGRESS_INTERVAL:
+                return
+            self.progress_shown = now
+            line = " | ".join(f"{title[:20]} {done}" for title, done in self.progress.items())
+            sys.stdout.write(f"\r⬇️  {line}\033[K")
+            sys.stdout.flush()
+
+    def download_opts(self, format_choice, outtmpl, progress_name, tmp_dir):
+        """Build the yt-dlp options for downloading in the given format"""
+        ydl_opts = {
+            'outtmpl': outtmpl,
+            'paths': {'home': str(self.download_path), 'temp': str(tmp_dir)},
+            'buffersize': 1 << 20,
+            'cachedir': str(self.cache_dir / 'ytdlp'),
+            # Progress goes to a single status line instead of yt-dlp's line-per-update printer
+            'quiet': True,
+            'noprogress': True,
+            'progress_hooks': [lambda d: self.report_progress(progress_name(d), d)],
+        }
+
+        if self.aria2c_available:
+            ydl_opts['external_downloader'] = {'default': 'aria2c'}
+            ydl_opts['external_downloader_args'] = {
+                'aria2c': ['-x', '16', '-s', '16', '-k', '1M', '--file-allocation=none', '--summary-interval=0']
             }
         else:
-            ydl_opts = {
-                'format': format_choice,
-                'outtmpl': str(self.download_path / f'{safe_title}.%(ext)s'),
-            }
+            ydl_opts['http_chunk_size'] = 10 << 20
+            ydl_opts['concurrent_fragment_downloads'] = 8
+
+        if format_choice == 'audio' and self.keep_native_audio:
+            ydl_opts['format'] = 'bestaudio[ext=m4a]/bestaudio'
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': NATIVE_AUDIO_CONVERSION,
+            }]
+        elif format_choice == 'audio':
+            ydl_opts['format'] = 'bestaudio/best'
+            ydl_opts['postprocessors'] = [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'mp3',
+                'preferredquality': '192',
+            }]
+        else:
+            ydl_opts['format'] = format_choice
+
+        return ydl_opts
+
+    def download_video(self, url, format_choice, title):
+        """Download video with selected format"""
+        safe_title = self.make_safe_title(title)
 
         try:
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                print(f"\nDownloading to: {self.download_path.absolute()}")
-                print("Please wait...")
-                ydl.download([url])
-                print("✅ Download completed successfully!")
-                return True
+            with self.job_tmp_dir() as tmp_dir:
+                ydl_opts = self.download_opts(format_choice, f'{safe_title}.%(ext)s', lambda d: safe_title, tmp_dir)
+                with load_yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    with PRINT_LOCK:
+                        print(f"\nDownloading to: {self.download_path.absolute()}")
+                        print("Please wait...")
+                    ydl.download([url])
+                    with PRINT_LOCK:
+                        print(f"\r\033[K✅ Download completed successfully: {safe_title}")
+                    return True
         except Exception as e:
-            print(f"❌ Download failed: {str(e)}")
+            with PRINT_LOCK:
+                print(f"\r\033[K❌ Download failed: {str(e)}")
             return False
+        finally:
+            with PRINT_LOCK:
+                self.progress.pop(safe_title, None)
+
+    def download_batch(self, urls, format_choice, scheduler, stop):
+        """Download videos one after another through a single YoutubeDL until stop is set; returns how many succeeded"""
+        finished = []
+
+        def check_stopped(d):
+            if stop.is_set():
+                raise load_yt_dlp().utils.DownloadCancelled()
+
+        def report_finished(filepath):
+            finished.append(filepath)
+            with PRINT_LOCK:
+                print(f"\r\033[K✅ Download completed successfully: {Path(filepath).name}")
+
+        try:
+            with self.job_tmp_dir() as tmp_dir:
+                ydl_opts = self.download_opts(format_choice, '%(title)s.%(ext)s',
+                                              lambda d: self.make_safe_title(d['info_dict'].get('title') or ''),
+                                              tmp_dir)
+                ydl_opts['progress_hooks'] += [scheduler.record, check_stopped]
+                ydl_opts['post_hooks'] = [report_finished]
+                # One unavailable video shouldn't stop the rest of the batch
+                ydl_opts['ignoreerrors'] = True
+
+                with load_yt_dlp().YoutubeDL(ydl_opts) as ydl:
+                    for url in urls:
+                        scheduler.acquire()
+                        try:
+                            if stop.is_set():
+                                break
+                            ydl.download([url])
+                        finally:
+                            scheduler.release()
+        except Exception as e:
+            # A cancelled batch isn't a failure worth reporting
+            if not stop.is_set():
+                with PRINT_LOCK:
+                    print(f"\r\033[K❌ Download failed: {str(e)}")
+        return len(finished)
+
+    def download_many(self, urls, format_choice):
+        """Download several videos in parallel and return how many succeeded"""
+        # Workers pull URLs from a shared queue; the scheduler decides how many download at once
+        workers = min(MAX_PARALLEL_DOWNLOADS, len(urls))
+        pending = queue.SimpleQueue()
+        for url in urls:
+            pending.put(url)
+        # Set on Ctrl-C so workers stop taking URLs and running downloads are cancelled
+        stop = threading.Event()
+
+        def next_urls():
+            while not stop.is_set():
+                try:
+                    yield pending.get_nowait()
+                except queue.Empty:
+                    return
+
+        # aria2c only reports finished files, which says too little about throughput to tune the limit
+        scheduler = DownloadScheduler(adaptive=not self.aria2c_available)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(self.download_batch, next_urls(), format_choice, scheduler, stop)
+                       for _ in range(workers)]
+            return sum(future.result() for future in as_completed(futures))
+        except KeyboardInterrupt:
+            stop.set()
+            scheduler.stop()
+            while not pending.empty():
+                pending.get_nowait()
+            raise
+        finally:
+            # Waits only for running downloads to reach their next progress hook
+            executor.shutdown(cancel_futures=True)
 
     def run(self):
         """Main application loop"""
@@ -137,14 +601,49 @@ class YouTubeDownloader:
                     print("Please enter a valid URL.")
                     continue
 
-                if 'youtube.com' not in url and 'youtu.be' not in url:
+                # Several URLs separated by commas or spaces are downloaded together
+                urls = URL_SEPARATOR_RE.split(url)
+                if len(urls) > 1:
+                    invalid = [u for u in urls if not YOUTUBE_URL_RE.match(u)]
+                    if invalid:
+                        print(f"Please enter valid YouTube URLs. Not recognised: {', '.join(invalid)}")
+                        continue
+
+                    print(f"🔍 Getting information for {len(urls)} videos...")
+                    videos = []
+                    for u, info in zip(urls, self.get_video_infos(urls)):
+                        if info:
+                            videos.append(u)
+                            print(f"📹 {info.get('title', 'Unknown Title')}")
+                        else:
+                            print(f"❌ Could not retrieve video information: {u}")
+
+                    if not videos:
+                        continue
+
+                    choice = input("Download as (v)ideo or (a)udio only? ").strip().lower()
+                    format_choice = 'audio' if choice in ['a', 'audio'] else 'best'
+
+                    print(f"⬇️  Downloading {len(videos)} videos to: {self.download_path.absolute()}")
+                    succeeded = self.download_many(videos, format_choice)
+                    print(f"\n📦 {succeeded} of {len(videos)} downloads completed.")
+                    continue
+
+                if not YOUTUBE_URL_RE.match(url):
                     print("Please enter a valid YouTube URL.")
                     continue
 
                 print("🔍 Getting video information...")
 
-                # Get video info
-                info = self.get_video_info(url)
+                # Get video info; a playlist only lists its videos until one is chosen
+                info = self.get_video_info(url, flat=True)
+                if info and info.get('_type') == 'playlist':
+                    url = self.choose_playlist_entry(info)
+                    if not url:
+                        continue
+                    print("🔍 Getting video information...")
+                    info = self.get_video_info(url)
+
                 if not info:
                     print("❌ Could not retrieve video information. Please check the URL.")
                     continue
@@ -168,6 +667,9 @@ class YouTubeDownloader:
 
                 # Display formats
                 self.display_formats(formats, title)
+                # Only spend bandwidth on the top format if the last video was downloaded in it
+                if self.picked_top_format:
+                    self.start_prefetch(url, formats[0]['format_id'])
 
                 # Get user choice
                 while True:
@@ -178,7 +680,7 @@ class YouTubeDownloader:
                         if choice_num == len(formats) + 1:
                             # Audio only
                             selected_format = 'audio'
-                            print("Selected: Audio Only (MP3)")
+                            print(f"Selected: Audio Only ({self.audio_ext.upper()})")
                             break
                         elif 1 <= choice_num <= len(formats):
                             selected_format = formats[choice_num - 1]['format_id']
@@ -190,8 +692,10 @@ class YouTubeDownloader:
                     except ValueError:
                         print("Please enter a valid number.")
 
-                # Download
-                success = self.download_video(url, selected_format, title)
+                self.picked_top_format = selected_format == formats[0]['format_id']
+
+                # Download, unless the background download already has it
+                success = self.use_prefetch(selected_format, title) or self.download_video(url, selected_format, title)
 
                 if success:
                     continue_choice = input("\nDownload another video? (y/n): ").strip().lower()
@@ -204,13 +708,30 @@ class YouTubeDownloader:
                 break
             except Exception as e:
                 print(f"An unexpected error occurred: {str(e)}")
+                self.cancel_prefetch()
                 continue
 
+        self.cancel_prefetch()
+        self.prefetch_executor.shutdown()
+        self.close()
+        if self.prefetch_hits or self.prefetch_misses:
+            print(f"⚡ Background downloads used: {self.prefetch_hits} of "
+                  f"{self.prefetch_hits + self.prefetch_misses}")
+
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Download YouTube videos in different resolutions")
+    parser.add_argument('--native-audio', action='store_true',
+                        help="save audio-only downloads as m4a without re-encoding to MP3")
+    args = parser.parse_args()
+
     try:
-        downloader = YouTubeDownloader()
+        # Only check that yt-dlp is installed; it is imported when first needed
+        if importlib.util.find_spec('yt_dlp') is None:
+            raise ImportError('yt_dlp')
+
+        downloader = YouTubeDownloader(keep_native_audio=args.native_audio)
         downloader.run()
     except ImportError:
         print("❌ Required library 'yt-dlp' not found.")